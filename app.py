@@ -1,31 +1,139 @@
 # -*- coding: utf-8 -*-
 
 from flask import Flask, request, jsonify
+from flask.json.provider import JSONProvider
+from werkzeug.exceptions import RequestEntityTooLarge
 import hashlib
 import hmac
 import base64
-import json
+import binascii
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
 # --- NUEVO: Importar la librería de PostgreSQL ---
 import psycopg2
+import orjson
+
+
+# Separadores de json.dumps equivalentes a la salida de orjson
+_COMPACT_SEPARATORS = ((',', ':'),)
+_INDENT_SEPARATORS = ((',', ': '), (', ', ': '))
+
+
+def _apply_object_hook(value, object_hook):
+    """Aplica object_hook a cada objeto JSON decodificado, empezando por los más internos."""
+    if isinstance(value, dict):
+        return object_hook({k: _apply_object_hook(v, object_hook) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_apply_object_hook(v, object_hook) for v in value]
+    return value
+
+
+class OrjsonProvider(JSONProvider):
+    """Proveedor JSON de Flask basado en orjson (request.get_json y jsonify)."""
+
+    def dumps(self, obj, **kwargs):
+        # Se traducen las opciones de json.dumps que orjson admite; el resto
+        # se rechaza en lugar de ignorarse en silencio.
+        default = kwargs.pop('default', None)
+        option = 0
+        if kwargs.pop('sort_keys', False):
+            option |= orjson.OPT_SORT_KEYS
+        indent = kwargs.pop('indent', None)
+        if indent == 2:
+            option |= orjson.OPT_INDENT_2
+        elif indent is not None:
+            raise TypeError(f"OrjsonProvider.dumps solo admite indent=2, no indent={indent!r}")
+        # orjson siempre escribe ',' y ':' sin espacios (': ' con sangría); se aceptan
+        # los separadores que Flask usa (p. ej. TaggedJSONSerializer para la sesión)
+        # porque ya coinciden con su salida.
+        separators = kwargs.pop('separators', None)
+        if separators is not None:
+            separators = tuple(separators)
+            allowed = _COMPACT_SEPARATORS if indent is None else _INDENT_SEPARATORS
+            if separators not in allowed:
+                raise TypeError(f"OrjsonProvider.dumps no admite separators={separators!r}")
+        if kwargs:
+            raise TypeError(f"OrjsonProvider.dumps no admite: {', '.join(sorted(kwargs))}")
+        return orjson.dumps(obj, default=default, option=option).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        # orjson no tiene object_hook; se aplica después, de dentro hacia fuera,
+        # igual que json.loads (Flask lo usa para leer la sesión firmada).
+        object_hook = kwargs.pop('object_hook', None)
+        if kwargs:
+            raise TypeError(f"OrjsonProvider.loads no admite: {', '.join(sorted(kwargs))}")
+        data = orjson.loads(s)
+        if object_hook is not None:
+            data = _apply_object_hook(data, object_hook)
+        return data
+
+    def response(self, *args, **kwargs):
+        # orjson ya produce bytes: se entregan tal cual, sin pasar por str
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Configuración
 SECRET_KEY = os.getenv('GOOGLE_WEBHOOK_SECRET', '')  # Vacío inicialmente
+SECRET_KEY_BYTES = SECRET_KEY.encode('utf-8') if SECRET_KEY else b''  # Se codifica una sola vez
 PORT = int(os.getenv('PORT', 5000))
+DATABASE_URL = os.environ.get('DATABASE_URL')  # Se lee una sola vez al iniciar
+# Tamaño máximo del cuerpo: Flask rechaza con 413 antes de leerlo (y de calcular el HMAC)
+MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 256 * 1024))
+app.config['MAX_CONTENT_LENGTH'] = MAX_CONTENT_LENGTH
+
+# Separadores de log
+_SEP50 = "=" * 50
+_WARN_BANNER = "⚠️" * 20
 
 # Logging
+# Los registros se encolan y un hilo en segundo plano los escribe en stderr,
+# para que los workers no compitan por el lock de la salida estándar.
+import atexit
 import logging
-logging.basicConfig(level=logging.INFO)
+import logging.handlers
+import queue
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler)
+# LOG_LEVEL=WARNING en producción evita formatear los registros INFO de cada petición.
+# Un valor desconocido no debe impedir que arranquen los workers: se usa INFO.
+# (getLevelName devuelve el número del nivel solo para nombres registrados;
+# funciona en todas las versiones, a diferencia de getLevelNamesMapping, 3.11+.)
+_LOG_LEVEL_ENV = os.getenv('LOG_LEVEL', 'INFO')
+_LOG_LEVEL_REQUESTED = _LOG_LEVEL_ENV.upper()
+LOG_LEVEL = _LOG_LEVEL_REQUESTED
+if not isinstance(logging.getLevelName(LOG_LEVEL), int):
+    LOG_LEVEL = 'INFO'
+logging.basicConfig(level=LOG_LEVEL, handlers=[logging.handlers.QueueHandler(_log_queue)])
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
+if LOG_LEVEL != _LOG_LEVEL_REQUESTED:
+    logger.warning("⚠️ LOG_LEVEL=%r no es un nivel válido; se usa INFO", _LOG_LEVEL_ENV)
+
+
+class LazyJson:
+    """Difiere la serialización JSON hasta que el logger realmente formatea el registro."""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return orjson.dumps(self.data, option=orjson.OPT_INDENT_2).decode('utf-8')
 
 
 # --- NUEVO: FUNCIONES PARA INTERACTUAR CON POSTGRESQL ---
 
 def get_db_connection():
     """Crea y devuelve una conexión a la base de datos PostgreSQL."""
-    DATABASE_URL = os.environ.get('DATABASE_URL')
     if not DATABASE_URL:
         logger.error("❌ La variable de entorno DATABASE_URL no está configurada.")
         return None
@@ -55,7 +163,7 @@ def create_table_if_not_exists():
         logger.info("✅ Tabla 'mensajes' verificada/creada correctamente.")
         return True
     except Exception as e:
-        logger.error(f"❌ Error al crear la tabla: {e}")
+        logger.error("❌ Error al crear la tabla: %s", e)
         return False
 
 def save_message_to_db(sender_phone, text_content, postback_data, message_id):
@@ -77,15 +185,41 @@ def save_message_to_db(sender_phone, text_content, postback_data, message_id):
         conn.commit()
         cur.close()
         conn.close()
-        logger.info(f"✅ Mensaje de '{sender_phone}' guardado en la base de datos.")
+        logger.info("✅ Mensaje de '%s' guardado en la base de datos.", sender_phone)
         return True
     except Exception as e:
-        logger.error(f"❌ Error al guardar el mensaje en la BD: {e}")
+        logger.error("❌ Error al guardar el mensaje en la BD: %s", e)
         return False
 
 # --- FIN DE LAS FUNCIONES DE POSTGRESQL ---
 
 
+def _hmac_sha512_pads(key):
+    """
+    Precalcula los estados SHA-512 con la clave XOR ipad/opad (RFC 2104).
+    Cada verificación copia estos estados en lugar de rehacer el key schedule.
+    """
+    block_size = hashlib.sha512().block_size
+    if len(key) > block_size:
+        key = hashlib.sha512(key).digest()
+    key = key.ljust(block_size, b'\0')
+    inner = hashlib.sha512(bytes(b ^ 0x36 for b in key))
+    outer = hashlib.sha512(bytes(b ^ 0x5c for b in key))
+    return inner, outer
+
+
+_HMAC_INNER, _HMAC_OUTER = _hmac_sha512_pads(SECRET_KEY_BYTES)
+
+
+def hmac_sha512(request_data):
+    """HMAC-SHA512 de request_data con SECRET_KEY, reutilizando los pads precalculados."""
+    inner = _HMAC_INNER.copy()
+    inner.update(request_data)
+    outer = _HMAC_OUTER.copy()
+    outer.update(inner.digest())
+    return outer.digest()
+
+
 def verify_signature(request_data, signature_header):
     """
     Verifica la firma de la solicitud de Google
@@ -101,18 +235,18 @@ def verify_signature(request_data, signature_header):
         return False
     
     try:
-        # Crear el hash HMAC
-        expected_signature = hmac.new(
-            SECRET_KEY.encode('utf-8'),
-            request_data,
-            hashlib.sha512
-        ).digest()
+        # Crear el hash HMAC a partir de los pads precalculados
+        expected_signature = hmac_sha512(request_data)
         
-        # Codificar en base64
-        expected_signature_b64 = base64.encodebytes(expected_signature).decode('utf-8').strip()
+        # Decodificar la firma recibida (base64) y comparar los bytes crudos
+        try:
+            received_signature = base64.b64decode(signature_header, validate=True)
+        except binascii.Error:
+            logger.warning("❌ Firma inválida (base64 mal formado)")
+            return False
         
         # Comparar de forma segura
-        is_valid = hmac.compare_digest(expected_signature_b64, signature_header)
+        is_valid = hmac.compare_digest(expected_signature, received_signature)
         
         if is_valid:
             logger.info("✅ Firma verificada correctamente")
@@ -122,10 +256,21 @@ def verify_signature(request_data, signature_header):
         return is_valid
     
     except Exception as e:
-        logger.error(f"❌ Error verificando firma: {e}")
+        logger.error("❌ Error verificando firma: %s", e)
         return False
 
 
+@lru_cache(maxsize=1)
+def _iso_timestamp(epoch_second):
+    """Formatea un segundo UNIX como ISO 8601 en UTC (se cachea el último)."""
+    return datetime.fromtimestamp(epoch_second, timezone.utc).isoformat()
+
+
+def utc_timestamp():
+    """Marca de tiempo UTC con resolución de un segundo para / y /health."""
+    return _iso_timestamp(int(time.time()))
+
+
 @app.route('/', methods=['GET'])
 def home():
     """
@@ -134,7 +279,7 @@ def home():
     return jsonify({
         'status': 'online',
         'service': 'Google RCS Business Messaging Webhook',
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': utc_timestamp(),
         'validation_mode': not bool(SECRET_KEY),
         'endpoints': {
             'webhook': '/webhook',
@@ -143,6 +288,41 @@ def home():
     }), 200
 
 
+@app.errorhandler(RequestEntityTooLarge)
+def payload_too_large(e):
+    """Responde 413 en JSON cuando el cuerpo supera MAX_CONTENT_LENGTH."""
+    logger.warning("❌ Payload demasiado grande (máximo %d bytes)", MAX_CONTENT_LENGTH)
+    return jsonify({'error': 'Payload too large'}), 413
+
+
+@app.before_request
+def verify_webhook_request():
+    """
+    Verifica la firma de /webhook antes de que se ejecute el handler.
+    Las solicitudes no autenticadas se rechazan sin llegar a parsear el JSON;
+    el cuerpo queda en caché para que webhook() no lo vuelva a leer.
+    """
+    # Solo POST: el OPTIONS automático de Flask para /webhook no lleva firma
+    if request.endpoint != 'webhook' or request.method != 'POST':
+        return None
+
+    logger.info(_SEP50)
+    logger.info("📨 Nueva solicitud recibida")
+    
+    # Obtener el contenido de la solicitud (se lee una sola vez)
+    request_data = request.get_data(cache=True)
+    signature = request.headers.get('X-Goog-Signature')
+    
+    logger.debug("Signature recibida: %s", signature or 'NINGUNA')
+    logger.info("Tamaño del payload: %d bytes", len(request_data))
+    
+    # Verificar firma (solo si SECRET_KEY está configurado)
+    if not verify_signature(request_data, signature):
+        logger.warning("❌ Verificación de firma falló")
+        return jsonify({'error': 'Invalid signature'}), 401
+    return None
+
+
 @app.route('/webhook', methods=['POST'])
 def webhook():
     """
@@ -150,90 +330,75 @@ def webhook():
     Maneja tanto mensajes directos como mensajes empaquetados (Pub/Sub).
     """
     try:
-        logger.info("=" * 50)
-        logger.info("📨 Nueva solicitud recibida")
-        
-        # Obtener el contenido de la solicitud
-        request_data = request.get_data()
-        signature = request.headers.get('X-Goog-Signature')
-        
-        logger.info(f"Signature recibida: {signature if signature else 'NINGUNA'}")
-        logger.info(f"Tamaño del payload: {len(request_data)} bytes")
-        
-        # Verificar firma (solo si SECRET_KEY está configurado)
-        if not verify_signature(request_data, signature):
-            logger.warning("❌ Verificación de firma falló")
-            return jsonify({'error': 'Invalid signature'}), 401
+        # La firma ya se verificó en verify_webhook_request; el cuerpo está en caché
+        request_data = request.get_data(cache=True)
         
-        # Parsear JSON
-        data = request.get_json()
+        # Parsear JSON una sola vez, reutilizando los mismos bytes de la firma
+        data = orjson.loads(request_data)
         
         if not data:
             logger.warning("❌ No se recibió data JSON")
             return jsonify({'error': 'No data received'}), 400
         
-        # --- ESTA LÍNEA YA IMPRIME EL JSON COMPLETO PARA DEPURACIÓN ---
-        logger.info(f"📦 Payload recibido:\n{json.dumps(data, indent=2)}")
-        
-        # =======================================================================
-        # LÓGICA ACTUALIZADA PARA MANEJAR MENSAJES EMPAQUETADOS Y DIRECTOS
-        # =======================================================================
-        
         # Caso especial: Verificación inicial de Google
+        # Se responde lo antes posible, sin volcar el payload de depuración.
         if 'clientToken' in data and 'secret' in data:
             logger.info("🔑 Recibida petición de verificación especial.")
             verification_secret = data.get('secret')
             client_token = data.get('clientToken')
-            logger.info(f"🔓 Respondiendo 200 OK con el secreto: {verification_secret} (para clientToken: {client_token})")
+            logger.info("🔓 Respondiendo 200 OK con el secreto: %s (para clientToken: %s)",
+                        verification_secret, client_token)
             return jsonify({'secret': verification_secret}), 200
 
+        # --- JSON COMPLETO SOLO PARA DEPURACIÓN (nivel DEBUG) ---
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📦 Payload recibido:\n%s", LazyJson(data))
+        
+        # =======================================================================
+        # LÓGICA ACTUALIZADA PARA MANEJAR MENSAJES EMPAQUETADOS Y DIRECTOS
+        # =======================================================================
+        
         # Determinar si es un mensaje empaquetado (Pub/Sub) o directo
-        message_data = data.get('message', {})
-        attributes = message_data.get('attributes', {})
+        message_data = data.get('message')
 
-        if attributes and 'message_type' in attributes:
+        if (isinstance(message_data, dict)
+                and (attributes := message_data.get('attributes'))
+                and 'message_type' in attributes):
             # --- ES UN MENSAJE EMPAQUETADO (Pub/Sub) ---
             logger.info("📦 Mensaje detectado en formato Pub/Sub. Desempaquetando...")
             
             # 1. Decodificar el contenido
             encoded_data = message_data.get('data', '')
-            decoded_bytes = base64.b64decode(encoded_data)
-            real_data = json.loads(decoded_bytes.decode('utf-8'))
+            real_data = orjson.loads(base64.b64decode(encoded_data))
             
             logger.info("✅ Mensaje desempaquetado correctamente.")
-            logger.info(f"📦 Contenido real:\n{json.dumps(real_data, indent=2)}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📦 Contenido real:\n%s", LazyJson(real_data))
             
             # 2. Obtener el tipo de mensaje real desde los atributos
             message_type = attributes.get('message_type')
-            logger.info(f"📌 Tipo de evento real (desde atributos): {message_type}")
+            logger.info("📌 Tipo de evento real (desde atributos): %s", message_type)
             
             
-           # 3. Llamar al manejador correcto con los datos desempaquetados
-            if message_type == 'SUGGESTION_RESPONSE':
-                handle_suggestion_response(real_data)
-            elif message_type == 'TEXT':
-                handle_message(real_data)
-            elif message_type == 'message':
-                handle_message(real_data)
+            # 3. Llamar al manejador correcto con los datos desempaquetados
+            handler = PUBSUB_HANDLERS.get(message_type)
+            if handler:
+                handler(real_data)
             else:
-                logger.warning(f"⚠️ Tipo de mensaje no manejado: {message_type}")
+                logger.warning("⚠️ Tipo de mensaje no manejado: %s", message_type)
 
         else:
             # --- ES UN MENSAJE DIRECTO ---
             logger.info("📬 Mensaje detectado en formato directo.")
             
-            # Usar la lógica original para determinar el tipo de evento
-            event_type = detect_event_type(data)
-            logger.info(f"📌 Tipo de evento (directo): {event_type}")
+            # La primera clave conocida (en el orden de HANDLERS) decide el evento
+            event_type = next((key for key in HANDLERS if key in data), None)
             
-            if event_type == 'message':
-                handle_message(data)
-            elif event_type == 'userStatus':
-                handle_user_status(data)
-            elif event_type == 'receipt':
-                handle_receipt(data)
+            if event_type:
+                logger.info("📌 Tipo de evento (directo): %s", event_type)
+                HANDLERS[event_type](data)
             else:
-                logger.warning(f"⚠️ Tipo de evento desconocido: {list(data.keys())}")
+                logger.warning("⚠️ Tipo de evento desconocido: %s", list(data))
         
         # =======================================================================
         # FIN DE LA LÓGICA ACTUALIZADA
@@ -241,34 +406,18 @@ def webhook():
         
         # Responder con 200 OK (MUY IMPORTANTE para validación de Google)
         logger.info("✅ Respondiendo 200 OK")
-        logger.info("=" * 50)
+        logger.info(_SEP50)
         return jsonify({'status': 'success'}), 200
     
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ Error parseando JSON: {e}")
+    except orjson.JSONDecodeError as e:
+        logger.error("❌ Error parseando JSON: %s", e)
         return jsonify({'error': 'Invalid JSON'}), 400
     
     except Exception as e:
-        logger.error(f"❌ Error procesando webhook: {e}", exc_info=True)
+        logger.error("❌ Error procesando webhook: %s", e, exc_info=True)
         return jsonify({'error': 'Internal server error'}), 500
 
 
-def detect_event_type(data):
-    """
-    Detecta el tipo de evento recibido (para mensajes directos)
-    """
-    if 'message' in data:
-        return 'message'
-    elif 'userStatus' in data:
-        return 'userStatus'
-    elif 'receipt' in data:
-        return 'receipt'
-    elif 'suggestionResponse' in data:
-        return 'suggestionResponse'
-    else:
-        return 'unknown'
-
-
 # =============================================================================
 # FUNCIÓN MEJORADA PARA MANEJAR MENSAJES (AHORA GUARDA EN BD)
 # =============================================================================
@@ -290,20 +439,21 @@ def handle_message(data):
     if not text_content:
         text_content = data.get('text', 'Mensaje sin texto')
 
-    # 3. Imprimir cabecera del mensaje procesado
-    print("\n" + "="*50)
-    print(f"💬 NUEVO MENSAJE RECIBIDO DE: {sender_phone}")
-    print("="*50)
-    print(f"📝 Tipo: Mensaje de Texto")
-    print(f"   Contenido: '{text_content}'")
-    print(f"🆔 ID del Mensaje: {message_id}")
-    print(f"⏰ Enviado a las: {timestamp}")
-    print("="*50 + "\n")
+    # 3. Registrar cabecera del mensaje procesado (un único registro)
+    logger.info(
+        "\n%s\n💬 NUEVO MENSAJE RECIBIDO DE: %s\n%s\n"
+        "📝 Tipo: Mensaje de Texto\n"
+        "   Contenido: '%s'\n"
+        "🆔 ID del Mensaje: %s\n"
+        "⏰ Enviado a las: %s\n%s",
+        _SEP50, sender_phone, _SEP50,
+        text_content, message_id, timestamp, _SEP50
+    )
 
     # --- NUEVO: GUARDAR EL MENSAJE EN LA BASE DE DATOS ---
     save_message_to_db(sender_phone, text_content, None, message_id)
     
-    logger.info(f"✅ Mensaje de '{sender_phone}' procesado correctamente.")
+    logger.info("✅ Mensaje de '%s' procesado correctamente.", sender_phone)
 
 
 # =============================================================================
@@ -322,17 +472,18 @@ def handle_suggestion_response(data):
     postback_data = suggestion_response.get('postbackData', '')
     text = suggestion_response.get('text', '')
     
-    print("\n" + "="*50)
-    print(f"🔘 RESPUESTA A SUGERENCIA RECIBIDA DE: {sender_phone}")
-    print("="*50)
-    print(f"   Texto: '{text}'")
-    print(f"   Postback Data: '{postback_data}'")
-    print("="*50 + "\n")
+    logger.info(
+        "\n%s\n🔘 RESPUESTA A SUGERENCIA RECIBIDA DE: %s\n%s\n"
+        "   Texto: '%s'\n"
+        "   Postback Data: '%s'\n%s",
+        _SEP50, sender_phone, _SEP50,
+        text, postback_data, _SEP50
+    )
 
     # --- NUEVO: GUARDAR LA RESPUESTA EN LA BASE DE DATOS ---
     save_message_to_db(sender_phone, text, postback_data, message_id)
     
-    logger.info(f"✅ Respuesta a sugerencia de '{sender_phone}' procesada correctamente.")
+    logger.info("✅ Respuesta a sugerencia de '%s' procesada correctamente.", sender_phone)
 
 
 # =============================================================================
@@ -343,14 +494,33 @@ def handle_user_status(data):
     user_status = data.get('userStatus', {})
     sender_id = data.get('senderPhoneNumber', 'Unknown')
     is_typing = user_status.get('isTyping', False)
-    logger.info(f"⌨️ Estado de usuario: {sender_id} está {'escribiendo...' if is_typing else 'inactivo'}.")
+    logger.info("⌨️ Estado de usuario: %s está %s.", sender_id, 'escribiendo...' if is_typing else 'inactivo')
 
 def handle_receipt(data):
     """Maneja confirmaciones de entrega/lectura."""
     receipt = data.get('receipt', {})
     message_id = receipt.get('messageId', 'Unknown')
     receipt_type = receipt.get('receiptType', 'Unknown')
-    logger.info(f"📧 Recibo: Mensaje {message_id} marcado como '{receipt_type}'.")
+    logger.info("📧 Recibo: Mensaje %s marcado como '%s'.", message_id, receipt_type)
+
+
+# =============================================================================
+# TABLAS DE DESPACHO DE EVENTOS
+# =============================================================================
+# Mensajes directos: clave de nivel superior -> manejador (en orden de prioridad)
+HANDLERS = {
+    'message': handle_message,
+    'userStatus': handle_user_status,
+    'receipt': handle_receipt,
+    'suggestionResponse': handle_suggestion_response,
+}
+
+# Mensajes Pub/Sub: atributo 'message_type' -> manejador
+PUBSUB_HANDLERS = {
+    'SUGGESTION_RESPONSE': handle_suggestion_response,
+    'TEXT': handle_message,
+    'message': handle_message,
+}
 
 
 @app.route('/health', methods=['GET'])
@@ -358,7 +528,7 @@ def health():
     """Endpoint de health check para monitoreo."""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': utc_timestamp(),
         'secret_configured': bool(SECRET_KEY)
     }), 200
 
@@ -372,14 +542,21 @@ with app.app_context():
 
 if __name__ == '__main__':
     if not SECRET_KEY:
-        logger.warning("⚠️" * 20)
+        logger.warning(_WARN_BANNER)
         logger.warning("⚠️ MODO VALIDACIÓN: SECRET_KEY no configurado")
         logger.warning("⚠️ El webhook aceptará todas las solicitudes")
         logger.warning("⚠️ Configura GOOGLE_WEBHOOK_SECRET después de la validación")
-        logger.warning("⚠️" * 20)
+        logger.warning(_WARN_BANNER)
     
+    # El servidor de Werkzeug es solo para desarrollo; en producción se usa
+    # gunicorn (ver Procfile).
+    if os.getenv('FLASK_ENV') != 'development':
+        logger.error("❌ El servidor de desarrollo requiere FLASK_ENV=development. "
+                     "En producción ejecuta: gunicorn app:app (ver Procfile)")
+        raise SystemExit(1)
+
     app.run(
         host='0.0.0.0',
         port=PORT,
-        debug=os.getenv('FLASK_ENV') == 'development'
+        debug=True
     )
\ No newline at end of file
@@ -1,12 +1,20 @@
 
 import duckdb
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 
 # Define la ruta del archivo de la base de datos DuckDB.
 # Este archivo DEBE estar excluido en .gitignore (como ya lo hicimos).
 DB_PATH = 'rcs_data.duckdb'
 
+# Columnas que se rellenan al registrar un envío; las marcas de tiempo usan su DEFAULT
+# y la respuesta del webhook se completa más tarde.
+TRANSACTION_INSERT_COLUMNS = ('transaction_id', 'phone_number', 'message_content', 'status')
+INSERT_TRANSACTION_SQL = (
+    f"INSERT INTO transactions ({', '.join(TRANSACTION_INSERT_COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in TRANSACTION_INSERT_COLUMNS)})"
+)
+
 def initialize_db():
     """
     Conecta a la base de datos DuckDB y crea la tabla 'transactions' si no existe.
@@ -16,7 +24,7 @@ def initialize_db():
 
     # Establece la conexión a DuckDB. Si el archivo no existe, lo crea automáticamente.
     try:
-        conn = duckdb.connect(database=DB_PATH)
+        conn = get_db_connection()
 
         # SQL para crear la tabla de transacciones.
         # Es idempotente (solo crea la tabla si no existe).
@@ -40,7 +48,12 @@ def initialize_db():
         return False
 
 def get_db_connection():
-    """Retorna un objeto de conexión DuckDB."""
+    """
+    Retorna un objeto de conexión DuckDB.
+    Se abre una conexión por llamada a propósito: DuckDB bloquea el archivo en
+    exclusiva mientras la conexión está abierta, y tanto Streamlit como Flask
+    (y este script) necesitan acceder a él desde procesos distintos.
+    """
     return duckdb.connect(database=DB_PATH)
 
 def fetch_all_transactions() -> List[Dict[str, Any]]:
@@ -63,9 +76,41 @@ def fetch_all_transactions() -> List[Dict[str, Any]]:
     finally:
         conn.close()
 
+TransactionRow = Tuple[str, str, Optional[str], str]
+
+def insert_transactions(rows: List[TransactionRow]) -> int:
+    """
+    Inserta varias transacciones (transaction_id, phone_number, message_content, status).
+    Todo el lote usa una única sentencia parametrizada con executemany
+    (se prepara una vez para todas las filas).
+    Cada lote es una transacción: se insertan todas sus filas o ninguna (ante un
+    error, p. ej. un transaction_id duplicado, se hace rollback y se relanza).
+    Retorna el número de filas insertadas.
+    """
+    if not rows:
+        return 0
+
+    conn = get_db_connection()
+    try:
+        conn.begin()
+        try:
+            conn.executemany(INSERT_TRANSACTION_SQL, rows)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return len(rows)
+    finally:
+        conn.close()
+
+def insert_transaction(transaction_id: str, phone_number: str,
+                       message_content: Optional[str], status: str = 'PENDING') -> None:
+    """Inserta una única transacción (p. ej. al enviar un mensaje desde Streamlit)."""
+    insert_transactions([(transaction_id, phone_number, message_content, status)])
+
 # ----------------------------------------------------
-# Nota: Funciones como 'insert_transaction' y 'update_transaction_status'
-# se añadirán cuando desarrollemos el código de Streamlit y Flask.
+# Nota: 'update_transaction_status' se añadirá cuando desarrollemos
+# el código de Flask que recibe las respuestas del webhook.
 # ----------------------------------------------------
 
 if __name__ == '__main__':
@@ -3,7 +3,10 @@
 import streamlit as st
 import uuid
 import os
+from datetime import datetime, timedelta, timezone
 import requests
+import orjson
+import google.auth.transport.requests
 import google.oauth2.credentials
 import google_auth_oauthlib.flow
 
@@ -24,9 +27,15 @@ def load_credentials():
     # En producción (Render), las credenciales están en una variable de entorno.
     credentials_json = os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
     if credentials_json:
-        return google.oauth2.credentials.Credentials.from_authorized_user_info(
-            info=eval(credentials_json)
+        # Se reutilizan las credenciales ya parseadas mientras la variable no cambie
+        cached = st.session_state.get("_credentials_cache")
+        if cached and cached[0] == credentials_json:
+            return cached[1]
+        credentials = google.oauth2.credentials.Credentials.from_authorized_user_info(
+            info=orjson.loads(credentials_json)
         )
+        st.session_state["_credentials_cache"] = (credentials_json, credentials)
+        return credentials
     # En desarrollo local, las cargamos desde el archivo credentials.json.
     else:
         flow = google_auth_oauthlib.flow.InstalledAppFlow.from_client_secrets_file(
@@ -36,17 +45,41 @@ def load_credentials():
         credentials = flow.run_local_server(port=8501)
         return credentials
 
+# Margen antes de la expiración a partir del cual se vuelve a refrescar el token
+TOKEN_REFRESH_MARGIN = timedelta(seconds=60)
+
 def get_access_token():
-    """Obtiene un token de acceso válido."""
+    """
+    Obtiene un token de acceso válido.
+    El token se guarda en st.session_state y solo se refresca cuando le queda
+    menos de TOKEN_REFRESH_MARGIN, evitando una llamada OAuth por cada envío.
+    """
+    cached = st.session_state.get("_rcs_token")
+    # google-auth expresa 'expiry' como datetime UTC sin zona horaria
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if cached and cached[1] and cached[1] - now > TOKEN_REFRESH_MARGIN:
+        return cached[0]
+
     credentials = load_credentials()
     if not credentials or not credentials.valid:
         st.error("❌ No se pudieron cargar las credenciales. Revisa el archivo credentials.json o las variables de entorno.")
         return None
     credentials.refresh(google.auth.transport.requests.Request())
+    st.session_state["_rcs_token"] = (credentials.token, credentials.expiry)
     return credentials.token
 
 # --- LÓGICA DE ENVÍO A LA API ---
 
+@st.cache_resource
+def get_http_session():
+    """
+    Sesión HTTP compartida entre reruns: reutiliza la conexión TLS con la API
+    de Google en lugar de abrir una nueva por cada mensaje.
+    """
+    session = requests.Session()
+    session.headers["Content-Type"] = "application/json"
+    return session
+
 def send_message_via_api(recipient_phone, message_text, transaction_id):
     """
     Envía un mensaje real a través de la API de Google RCS.
@@ -58,10 +91,9 @@ def send_message_via_api(recipient_phone, message_text, transaction_id):
     # URL del endpoint de la API de Google para enviar mensajes
     url=f"https://businessmessages.googleapis.com/v1/agents/orange_empresas_uonv4h9f_agent@rbm.oog/messages:send"
 
-    # Cabeceras de la petición
+    # Cabeceras de la petición (Content-Type ya viene de la sesión)
     headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
+        "Authorization": f"Bearer {access_token}"
     }
 
     # Cuerpo (payload) del mensaje
@@ -76,7 +108,7 @@ def send_message_via_api(recipient_phone, message_text, transaction_id):
     }
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = get_http_session().post(url, headers=headers, json=payload)
         
         if response.status_code == 200:
             return response.json(), "Mensaje enviado con éxito."